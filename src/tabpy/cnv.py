@@ -1,28 +1,30 @@
 from __future__ import annotations
+from bisect import bisect_right
 from collections import defaultdict
-from dataclasses import FrozenInstanceError, InitVar, dataclass, field, replace
-from functools import reduce
+from dataclasses import FrozenInstanceError, dataclass, field
+from functools import lru_cache
+from heapq import heappop, heappush
 from pathlib import Path
 import re
-from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+import sys
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 def try_str2int(val: str) -> str|int:
     try:
         return int(val)
-    except:
+    except ValueError:
         return val
 
 def int_or_none(val: str) -> Optional[int]:
-    val = val.strip()
-    if val == "":
+    # int() already ignores surrounding whitespace
+    if val == "" or val.isspace():
         return None
     else:
         return int(val)
 
-IntCodeRegex = re.compile(r"^\d+$")
-IntRangeRegex = re.compile(r"^(\d+)-(\d+)$")
+FirstLineRegex = re.compile(r"\s*(\d+)\s+(\d+)(?:\s(L))?")
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IntRange:
     start: int
     end: int
@@ -33,18 +35,19 @@ class IntRange:
     def __repr__(self) -> str:
         return "%s(%r, %r)" % (self.__class__.__name__, self.start, self.end)
 
-StrCodeRegex = re.compile(r"^([^-,]+)$")
-StrRangeRegex = re.compile(r"^([^-,]+)-([^-,]+)$")
-
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class StrRange:
     start: str
     end: str
+    _min_len: int = field(init=False, repr=False, compare=False)
+    _max_len: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self, *args):
+        object.__setattr__(self, '_min_len', min(len(self.start), len(self.end)))
+        object.__setattr__(self, '_max_len', max(len(self.start), len(self.end)))
 
     def __contains__(self, item: str) -> bool:
-        min_len = min(len(self.start), len(self.end))
-        max_len = max(len(self.start), len(self.end))
-        return min_len <= len(item) <= max_len and self.start <= item <= self.end
+        return self._min_len <= len(item) <= self._max_len and self.start <= item <= self.end
 
     def __repr__(self) -> str:
         return "%s(%r, %r)" % (self.__class__.__name__, self.start, self.end)
@@ -54,46 +57,250 @@ class InvalidCnvFirstLine(ValueError): pass
 Code = int|str
 CodeRange = IntRange|StrRange
 
+# Categories whose integer codes are all below this get a bitset for fast membership checks
+MaxBitsetCode = 10_000
+# Integer ranges are expanded into the CategorySet lookup dict as long as they cover at most this many codes in total,
+# and lookup_array only builds a dense table for code sets whose integer codes and ranges all fall below it
+MaxExpandedCodes = 100_000
+
 @dataclass(frozen=True)
 class CategorySet:
     code_length: int
     letter_codes: bool
-    categories: FrozenSet[Category]
+    categories: Tuple[Category, ...]
+    _code_index: Dict[Code, Tuple[int, Category]] = field(init=False, repr=False, compare=False)
+    _str_range_index: List[Tuple[int, StrRange, Category]] = field(init=False, repr=False, compare=False)
+    _int_range_starts: List[int] = field(init=False, repr=False, compare=False)
+    _int_range_ends: List[int] = field(init=False, repr=False, compare=False)
+    _int_range_cats: List[Tuple[int, Category]] = field(init=False, repr=False, compare=False)
+    _leaf_index: Dict[Code, Category] = field(init=False, repr=False, compare=False)
+    _lut: Any = field(init=False, repr=False, compare=False)
+    _lut_leaves: Any = field(init=False, repr=False, compare=False)
+    _paths: Dict[int, Tuple[Category, ...]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self, *args):
+        object.__setattr__(self, 'categories', tuple(sorted(self.categories, key=lambda x: x.idx)))
+
+        # Rank the categories in the order get_leaf must try them: children before their parent, siblings by idx.
+        # An explicit stack keeps deep trees clear of the recursion limit.
+        def post_order(root: Category):
+            stack: List[Tuple[Category, Tuple[Category, ...], bool]] = [(root, (root,), False)]
+            while stack:
+                cat, path, children_done = stack.pop()
+                if children_done:
+                    yield cat, path
+                    continue
+                stack.append((cat, path, True))
+                for child in reversed(cat.children):
+                    stack.append((child, path + (child,), False))
+
+        code_index: Dict[Code, Tuple[int, Category]] = {}
+        str_range_index: List[Tuple[int, StrRange, Category]] = []
+        int_ranges: List[Tuple[int, IntRange, Category]] = []
+        # Paths from the root, keyed by id() since the same Category may also belong to other sets with other parents
+        paths: Dict[int, Tuple[Category, ...]] = {}
+        rank = 0
+        for root in self.categories:
+            for cat, path in post_order(root):
+                paths.setdefault(id(cat), path)
+                for code in cat.codes:
+                    code_index.setdefault(code, (rank, cat))
+                for code_range in cat.ranges:
+                    if isinstance(code_range, IntRange):
+                        int_ranges.append((rank, code_range, cat))
+                    else:
+                        str_range_index.append((rank, code_range, cat))
+                rank += 1
+        object.__setattr__(self, '_code_index', code_index)
+        object.__setattr__(self, '_str_range_index', str_range_index)
+        object.__setattr__(self, '_paths', paths)
+        # Built by lookup_array and map_codes on first use
+        object.__setattr__(self, '_lut', None)
+        object.__setattr__(self, '_lut_leaves', None)
+
+        # Split the (possibly overlapping) integer ranges into sorted disjoint segments, each one owned by the
+        # highest precedence category covering it, so that get_leaf can bisect them
+        starts: List[int] = []
+        ends: List[int] = []
+        cats: List[Tuple[int, Category]] = []
+        int_ranges.sort(key=lambda x: x[1].start)
+        bounds = sorted({x[1].start for x in int_ranges} | {x[1].end + 1 for x in int_ranges})
+        active: List[Tuple[int, int, int, Category]] = []
+        i = 0
+        for start, next_start in zip(bounds, bounds[1:]):
+            while i < len(int_ranges) and int_ranges[i][1].start <= start:
+                rank, code_range, cat = int_ranges[i]
+                heappush(active, (rank, i, code_range.end, cat))
+                i += 1
+            while active and active[0][2] < start:
+                heappop(active)
+            if not active:
+                continue
+            rank, _, _, cat = active[0]
+            if cats and cats[-1][1] is cat and ends[-1] == start - 1:
+                ends[-1] = next_start - 1
+            else:
+                starts.append(start)
+                ends.append(next_start - 1)
+                cats.append((rank, cat))
+        object.__setattr__(self, '_int_range_starts', starts)
+        object.__setattr__(self, '_int_range_ends', ends)
+        object.__setattr__(self, '_int_range_cats', cats)
+
+        # Resolve the concrete codes (and, if there aren't too many, every integer covered by a range) up front.
+        # String codes that some string range of higher precedence might shadow would each need a scan of the
+        # ranges, so _find_leaf resolves those on first use instead.
+        leaf_index: Dict[Code, Category] = {}
+        object.__setattr__(self, '_leaf_index', leaf_index)
+        first_str_range_rank = str_range_index[0][0] if str_range_index else rank
+        for code, (code_rank, cat) in code_index.items():
+            if isinstance(code, int):
+                leaf_index[code] = self._find_leaf(code)
+            elif code_rank <= first_str_range_rank:
+                leaf_index[code] = cat
+        if sum(end - start + 1 for start, end in zip(starts, ends)) <= MaxExpandedCodes:
+            for start, end, (_, cat) in zip(starts, ends, cats):
+                for code in range(start, end + 1):
+                    leaf_index.setdefault(code, cat)
+
+    def __reduce__(self):
+        # The indexes hold id()s, so rebuild them on unpickling instead of copying them
+        return (self.__class__, (self.code_length, self.letter_codes, self.categories))
 
     def __len__(self):
         return len(self.categories)
 
     def get_root(self, item: Code) -> Optional[Category]:
-        for cat in self.categories:
-            if item in cat:
-                return cat
-        return None
+        leaf = self.get_leaf(item)
+        return self._paths[id(leaf)][0] if leaf is not None else None
 
     def get_leaf(self, item: Code) -> Optional[Category]:
-        for cat in self.categories:
-            if ans := cat.get_leaf(item):
-                return ans
-        return None
+        """Returns the most specific category containing the code, or None if there is no such category."""
+        ans = self._leaf_index.get(item)
+        if ans is not None:
+            return ans
+        return self._find_leaf(item)
+
+    def _find_leaf(self, item: Code) -> Optional[Category]:
+        # Codes that are not in the set rank after every range
+        hit = self._code_index.get(item)
+        rank, ans = hit if hit is not None else (sys.maxsize, None)
+        if isinstance(item, str):
+            for range_rank, code_range, cat in self._str_range_index:
+                if range_rank >= rank:
+                    break
+                if item in code_range:
+                    ans = cat
+                    break
+            # Keep the codes of the set, but not every string that only some range matches
+            if hit is not None and ans is not None:
+                self._leaf_index[item] = ans
+            return ans
+
+        i = bisect_right(self._int_range_starts, item) - 1
+        if i >= 0 and item <= self._int_range_ends[i]:
+            range_rank, cat = self._int_range_cats[i]
+            if range_rank < rank:
+                return cat
+        return ans
 
     def get_path(self, item: Code) -> Optional[List[Category]]:
-        for cat in self.categories:
-            if ans := cat.get_path(item):
-                return ans
-        return None
+        leaf = self.get_leaf(item)
+        return list(self._paths[id(leaf)]) if leaf is not None else None
 
     def __getitem__(self, item: Code) -> Category:
-        ans = self.get_leaf(item)
-        if ans is not None:
+        # Same as get_leaf, inlined to save a method call on the hot path
+        ans = self._leaf_index.get(item)
+        if ans is None:
+            ans = self._find_leaf(item)
+            if ans is None:
+                raise KeyError(item)
+        return ans
+
+    def lookup_array(self, codes: Any) -> Any:
+        """Maps an array of integer codes to the idx of their leaf categories (-1 for unknown codes) in a single vectorized operation. Requires NumPy and only works for numeric code sets."""
+        import numpy as np
+
+        if self.letter_codes:
+            raise ValueError("lookup_array only supports numeric code sets")
+
+        lut = self._lut
+        if lut is None:
+            int_codes = sorted(code for code in self._code_index if isinstance(code, int))
+            # The header's code length is only a hint: codes and ranges may go past it
+            size = max([-1, *self._int_range_ends, *int_codes]) + 1
+            if size <= MaxExpandedCodes:
+                lut = np.full(size, -1, dtype=np.int32)
+                for start, end, (_, cat) in zip(self._int_range_starts, self._int_range_ends, self._int_range_cats):
+                    lut[max(start, 0):max(end + 1, 0)] = cat.idx
+                for code in int_codes:
+                    if code >= 0:
+                        lut[code] = self._leaf_index[code].idx
+            else:
+                # Too big for a dense table (e.g. a catch-all 00-99999999), so keep the sorted range segments and codes
+                # for searchsorted instead
+                lut = (
+                    np.array(self._int_range_starts, dtype=np.int64),
+                    np.array(self._int_range_ends, dtype=np.int64),
+                    np.array([cat.idx for _, cat in self._int_range_cats], dtype=np.int32),
+                    np.array(int_codes, dtype=np.int64),
+                    np.array([self._leaf_index[code].idx for code in int_codes], dtype=np.int32),
+                )
+            object.__setattr__(self, '_lut', lut)
+
+        codes = np.asarray(codes)
+        if codes.dtype.kind == 'f':
+            # e.g. a pandas integer column with missing values: NaN maps to -1 like any other unknown code
+            finite = np.isfinite(codes)
+            if (codes[finite] % 1 != 0).any():
+                raise ValueError("lookup_array only supports integer codes")
+        elif codes.dtype.kind not in 'iu':
+            raise ValueError(f"lookup_array only supports integer codes, not {codes.dtype}")
+        ans = np.full(codes.shape, -1, dtype=np.int32)
+        if isinstance(lut, np.ndarray):
+            valid = (codes >= 0) & (codes < len(lut))
+            ans[valid] = lut[codes[valid].astype(np.int64)]
             return ans
-        else:
-            raise KeyError(item)
+
+        starts, ends, segment_leaves, int_codes, code_leaves = lut
+        valid = (codes > -2**63) & (codes < 2**63)
+        values = codes[valid].astype(np.int64)
+        found = np.full(values.shape, -1, dtype=np.int32)
+        if len(starts):
+            i = np.searchsorted(starts, values, 'right') - 1
+            hit = (i >= 0) & (values <= ends[i])
+            found[hit] = segment_leaves[i[hit]]
+        if len(int_codes):
+            # get_leaf already settled whether each code or the range around it wins
+            j = np.minimum(np.searchsorted(int_codes, values), len(int_codes) - 1)
+            hit = int_codes[j] == values
+            found[hit] = code_leaves[j[hit]]
+        ans[valid] = found
+        return ans
+
+    def map_codes(self, codes: Any) -> Any:
+        """Like lookup_array, but returns an object array with the leaf Category of each code (None for unknown codes)."""
+        import numpy as np
+
+        leaves = self._lut_leaves
+        if leaves is None:
+            flat_categories = self.flat_categories
+            # The last slot stays None so that the -1 of unknown codes picks it
+            leaves = np.full(max(flat_categories, default=-1) + 2, None, dtype=object)
+            for idx, cat in flat_categories.items():
+                leaves[idx] = cat
+            object.__setattr__(self, '_lut_leaves', leaves)
+
+        return leaves[self.lookup_array(codes)]
 
     @property
     def flat_categories(self) -> Dict[int, Category]:
-        def flatten(cat: Category):
-            yield cat
-            for child in cat.children:
-                flatten(child)
+        def flatten(root: Category):
+            stack = [root]
+            while stack:
+                cat = stack.pop()
+                yield cat
+                stack.extend(reversed(cat.children))
 
         ans: Dict[int, Category] = {}
         for cat in self.categories:
@@ -105,13 +312,15 @@ class CategorySet:
         return ans
 
     @staticmethod
-    def from_cnv_file(contents: str) -> CategorySet:
-        """Creates a new CategorySet from the contents of a CNV file."""
-        lines = contents.split("\n")
-        reFirstLine = re.compile(r"\s*(\d+)\s+(\d+)(?:\s(L))?")
-        m = reFirstLine.match(lines[0])
+    def from_cnv_file(contents: str|bytes|Iterable[str], encoding: str = 'iso-8859-1') -> CategorySet:
+        """Creates a new CategorySet from the contents of a CNV file, given either as a single string or as an iterable of lines (e.g. an open file). Raw bytes are decoded once with the given encoding (see from_cnv_path)."""
+        if isinstance(contents, bytes):
+            contents = contents.decode(encoding)
+        lines = iter(contents.split("\n") if isinstance(contents, str) else contents)
+        first_line = next(lines, "")
+        m = FirstLineRegex.match(first_line)
         if m is None:
-            raise InvalidCnvFirstLine(lines[0])
+            raise InvalidCnvFirstLine(first_line)
 
         n_categories, code_length, letter_codes = int(m.group(1)), int(m.group(2)), m.group(3)
         if letter_codes is None:
@@ -119,87 +328,114 @@ class CategorySet:
         elif letter_codes == 'L':
             letter_codes = True
         else:
-            raise InvalidCnvFirstLine(lines[0])
-
+            raise InvalidCnvFirstLine(first_line)
 
-        # Parse each line
-        raw_category_lines: Dict[int, List[RawCategoryLine]] = defaultdict(list)
-        for line in lines[1:]:
-            if parsed_line := RawCategoryLine.from_cnv_line(line, letter_codes):
-                raw_category_lines[parsed_line.idx].append(parsed_line)
 
-        # Join lines
+        # Parse each line, joining the codes of categories spread over multiple lines and recording the tree as we go
         raw_categories: Dict[int, RawCategoryLine] = {}
-        for raw_cat_lines in raw_category_lines.values():
-            # Join the multiple lines of the category if needed
-            if len(raw_cat_lines) == 1:
-                cat_raw = raw_cat_lines[0]
-                raw_categories[cat_raw.idx] = cat_raw
-            else:
-                cat_raw = raw_cat_lines[0]
-                codes = reduce(lambda a, b: a.codes + b.codes, raw_cat_lines)
-                code_ranges = reduce(lambda a, b: a.code_ranges + b.code_ranges, raw_cat_lines)
-                raw_categories[cat_raw.idx] = replace(cat_raw, codes=codes, code_ranges=code_ranges)
-
-        # Compute children
+        joined_codes: Dict[int, List[Code]] = {}
+        joined_ranges: Dict[int, List[CodeRange]] = {}
         direct_children: Dict[int, List[int]] = defaultdict(list)
-        roots: Set[int] = set()
-        for raw_cat in raw_categories.values():
-            if raw_cat.parent_idx is None:
-                roots.add(raw_cat.idx)
+        roots: List[int] = []
+        for line in lines:
+            # Skip blank lines and comments
+            stripped = line.lstrip()
+            if not stripped or stripped[0] == ";":
+                continue
+            parsed_line = RawCategoryLine.from_cnv_line(line, letter_codes)
+            if first_part := raw_categories.get(parsed_line.idx):
+                joined_codes.setdefault(parsed_line.idx, list(first_part.codes)).extend(parsed_line.codes)
+                joined_ranges.setdefault(parsed_line.idx, list(first_part.code_ranges)).extend(parsed_line.code_ranges)
+                continue
+            raw_categories[parsed_line.idx] = parsed_line
+            if parsed_line.parent_idx is None:
+                roots.append(parsed_line.idx)
             else:
-                direct_children[raw_cat.parent_idx].append(raw_cat.idx)
-
-        # Make categories
-        def make_category(cat_idx: int) -> Category:
-            children = []
-            for child_idx in direct_children[cat_idx]:
-                children.append(make_category(child_idx))
+                direct_children[parsed_line.parent_idx].append(parsed_line.idx)
+
+        # Make categories, walking the breadth-first order backwards so that children are always built before their parents
+        order: List[int] = list(roots)
+        for cat_idx in order:
+            order.extend(direct_children[cat_idx])
+        built: Dict[int, Category] = {}
+        # Categories with the same codes (e.g. the XX of every region) share a single frozenset
+        shared_sets: Dict[FrozenSet[Any], FrozenSet[Any]] = {}
+        for cat_idx in reversed(order):
             raw_cat = raw_categories[cat_idx]
-            return Category(raw_cat.idx, raw_cat.name, raw_cat.codes, raw_cat.code_ranges, raw_cat.parent_idx, frozenset(children))
-        categories: List[Category] = []
-        for cat_idx in roots:
-            categories.append(make_category(cat_idx))
+            codes = frozenset(joined_codes.get(cat_idx, raw_cat.codes))
+            codes = shared_sets.setdefault(codes, codes)
+            code_ranges = frozenset(joined_ranges.get(cat_idx, raw_cat.code_ranges))
+            code_ranges = shared_sets.setdefault(code_ranges, code_ranges)
+            children = [built[child_idx] for child_idx in direct_children[cat_idx]]
+            built[cat_idx] = Category(raw_cat.idx, raw_cat.name, codes, code_ranges, raw_cat.parent_idx, children)
+        categories: List[Category] = [built[cat_idx] for cat_idx in roots]
 
         # Finish
-        return CategorySet(code_length, letter_codes, frozenset(categories))
+        return CategorySet(code_length, letter_codes, categories)
 
     @staticmethod
     def from_cnv_path(file_path: str|Path, encoding: str = 'iso-8859-1') -> CategorySet:
         """Creates a new CategorySet from a path to a CNV file. By default, the file will be read with the ISO-8859-1 (aka Latin-1) encoding as this is what SUS uses on its FTP server."""
         with open(file_path, 'r', encoding=encoding) as f:
-            return CategorySet.from_cnv_file(f.read())
+            return CategorySet.from_cnv_file(f)
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Category:
     idx: int
     name: str
     codes: FrozenSet[Code] = field(default_factory=frozenset)
     ranges: FrozenSet[CodeRange] = field(default_factory=frozenset)
     parent_idx: Optional[int] = None
-    children: FrozenSet[Category] = field(default_factory=frozenset)
-    _all_codes: InitVar[FrozenSet[Code]] = None
-    _all_ranges: InitVar[FrozenSet[CodeRange]] = None
+    children: Tuple[Category, ...] = field(default_factory=tuple)
+    _all_codes: FrozenSet[Code] = field(init=False, repr=False, compare=False)
+    _all_ranges: FrozenSet[CodeRange] = field(init=False, repr=False, compare=False)
+    _all_int_ranges: Tuple[IntRange, ...] = field(init=False, repr=False, compare=False)
+    _all_str_ranges: Tuple[StrRange, ...] = field(init=False, repr=False, compare=False)
+    _all_codes_bitset: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def is_leaf(self) -> bool:
         return len(self.children) == 0
 
     def __contains__(self, item: Code) -> bool:
-        return item in self._all_codes or any([item in x for x in self._all_ranges])
+        if isinstance(item, str):
+            return item in self._all_codes or any(item in x for x in self._all_str_ranges)
+        bitset = self._all_codes_bitset
+        if bitset is not None and isinstance(item, int):
+            return 0 <= item and (item >> 3) < len(bitset) and bool(bitset[item >> 3] >> (item & 7) & 1)
+        return item in self._all_codes or any(item in x for x in self._all_int_ranges)
 
     def __post_init__(self, *args):
-        self.__dict__['codes'] = frozenset(self.codes)
-        self.__dict__['ranges'] = frozenset(self.ranges)
-        self.__dict__['children'] = frozenset(self.children)
-
-        all_codes: Set[Code] = set(self.codes)
-        all_ranges: Set[CodeRange] = set(self.ranges)
-        for child in self.children:
-            all_codes = all_codes.union(child._all_codes)
-            all_ranges = all_ranges.union(child._all_ranges)
-        self.__dict__['_all_codes'] = all_codes
-        self.__dict__['_all_ranges'] = all_ranges
+        object.__setattr__(self, 'codes', frozenset(self.codes))
+        object.__setattr__(self, 'ranges', frozenset(self.ranges))
+        object.__setattr__(self, 'children', tuple(sorted(self.children, key=lambda x: x.idx)))
+
+        if self.children:
+            object.__setattr__(self, '_all_codes', self.codes.union(*(child._all_codes for child in self.children)))
+            object.__setattr__(self, '_all_ranges', self.ranges.union(*(child._all_ranges for child in self.children)))
+        else:
+            # frozenset.union() always copies, so leaves share their own sets instead
+            object.__setattr__(self, '_all_codes', self.codes)
+            object.__setattr__(self, '_all_ranges', self.ranges)
+        object.__setattr__(self, '_all_int_ranges', tuple(x for x in self._all_ranges if isinstance(x, IntRange)))
+        object.__setattr__(self, '_all_str_ranges', tuple(x for x in self._all_ranges if isinstance(x, StrRange)))
+        object.__setattr__(self, '_all_codes_bitset', self._make_bitset())
+
+    def _make_bitset(self) -> Optional[bytes]:
+        """Packs the integer codes and ranges of the category (and its children) in a little-endian bitset, or returns None if some of them are not small non-negative integers. String codes and ranges are left out."""
+        mask = 0
+        for code in self._all_codes:
+            if isinstance(code, str):
+                continue
+            if not isinstance(code, int) or not 0 <= code < MaxBitsetCode:
+                return None
+            mask |= 1 << code
+        for code_range in self._all_int_ranges:
+            if code_range.start < 0 or code_range.end >= MaxBitsetCode:
+                return None
+            if code_range.start <= code_range.end:
+                mask |= ((1 << (code_range.end - code_range.start + 1)) - 1) << code_range.start
+        return mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
 
     def get_leaf(self, item: Code) -> Optional[Category]:
         for cat in self.children:
@@ -213,7 +449,7 @@ class Category:
                 return [self]+ans
         return [self] if item in self else None
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RawCategoryLine:
     idx: int
     parent_idx: Optional[int]
@@ -223,42 +459,47 @@ class RawCategoryLine:
     code_ranges: List[CodeRange]
 
     @staticmethod
-    def from_cnv_line(line: str, only_strings: bool) -> Optional[RawCategoryLine]:
-        """Creates a new Category from a line of a CNV file."""
-        if line.strip() == "":
-            return None
-        if line.lstrip().startswith(";"):
-            return None
-
-        line += " "*70 # ensure the line is long enough
+    def from_cnv_line(line: str, only_strings: bool) -> RawCategoryLine:
+        """Creates a new Category from a line of a CNV file. Blank lines and comments must be skipped by the caller."""
+        # Slicing past the end of a short line just yields empty strings, so there is no need to pad it
         parent = int_or_none(line[0:3])
         idx = int(line[3:7])
-        name = line[9:59].strip()
-        codes_spec = line[60:].rstrip()
+        name = sys.intern(line[9:59].strip())
+        codes_spec = sys.intern(line[60:].rstrip())
         codes, code_ranges = parse_category_codes(codes_spec, only_strings)
         return RawCategoryLine(idx, parent, name, codes_spec, codes, code_ranges)
 
 
+@lru_cache(maxsize=4096)
 def parse_category_code(item: str, only_strings: bool) -> Code|CodeRange:
-    if not only_strings:
-        if IntCodeRegex.match(item):
+    """Parses a single code (e.g. "11" or "SP") or range of codes (e.g. "00-99" or "A01-A98") from a CNV codes spec. Codes made only of digits become ints unless only_strings is set."""
+    if item == "" or "," in item:
+        raise ValueError(item)
+
+    start, sep, end = item.partition("-")
+    if not sep:
+        if not only_strings and item.isdecimal():
             return int(item)
-        if m := IntRangeRegex.match(item):
-            start, end = m.group(1), m.group(2)
-            return IntRange(int(start), int(end))
+        return sys.intern(item)
 
-    if StrCodeRegex.match(item):
-        return str(item)
+    if start == "" or end == "" or "-" in end:
+        raise ValueError(item)
+    if not only_strings and start.isdecimal() and end.isdecimal():
+        return _intern_int_range(int(start), int(end))
+    return _intern_str_range(sys.intern(start), sys.intern(end))
 
-    if m := StrRangeRegex.match(item):
-        start, end = m.group(1), m.group(2)
-        return StrRange(start, end)
+@lru_cache(maxsize=1024)
+def _intern_int_range(start: int, end: int) -> IntRange:
+    return IntRange(start, end)
 
-    raise ValueError(item)
+@lru_cache(maxsize=1024)
+def _intern_str_range(start: str, end: str) -> StrRange:
+    return StrRange(start, end)
 
 def parse_category_codes(itens: str, only_strings: bool) -> Tuple[List[Code], List[CodeRange]]:
-    itens = itens.split(",")
-    codes_and_ranges = list(map(lambda x: parse_category_code(x, only_strings), itens))
-    codes = list(filter(lambda x: isinstance(x, Code), codes_and_ranges))
-    ranges = list(filter(lambda x: isinstance(x, CodeRange), codes_and_ranges))
+    codes: List[Code] = []
+    ranges: List[CodeRange] = []
+    for item in itens.split(","):
+        code = parse_category_code(item, only_strings)
+        (ranges if isinstance(code, (IntRange, StrRange)) else codes).append(code)
     return codes, ranges
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from enum import IntEnum
-from typing import NewType, Tuple
+from typing import Any, NewType, Tuple
 
 # We do this weird thing so that the end user can configure and change the cut off year at runtime
 MAX_XXI_CENTURY_YEAR = 39
@@ -12,6 +12,9 @@ def MAXIMUM_YEAR() -> int:
 class OutOfRangeError(ValueError):
     pass
 
+# Zero padded two digit strings, indexed by their value
+TWO_DIGIT_STRS = tuple(f"{i:02d}" for i in range(100))
+
 class Month(IntEnum):
     January = 1
     February = 2
@@ -28,30 +31,36 @@ class Month(IntEnum):
 
     @property
     def as_pt_short_name(self) -> str:
-        return {1: "jan", 2: "fev", 3: "mar", 4: "abr", 5: "abr", 6: "jun", 7: "jul", 8: "ago", 9: "set", 10: "out", 11: "nov", 12: "dez"}[self]
+        return MONTH_PT_SHORT_NAMES[self-1]
 
     @property
     def as_pt_full_name(self) -> str:
-        return {1: "janeiro", 2: "fevereiro", 3: "março", 4: "abril", 5: "abril", 6: "junho", 7: "julho", 8: "agosto", 9: "setembro", 10: "outubro", 11: "novembro", 12: "dezembro"}[self]
+        return MONTH_PT_FULL_NAMES[self-1]
 
     @property
     def as_en_short_name(self) -> str:
-        return {1: "Jan", 2: "Feb", 3: "Mar", 4: "Apr", 5: "May", 6: "Jun", 7: "Jul", 8: "Aug", 9: "Sep", 10: "Oct", 11: "Nov", 12: "Dec"}[self]
+        return MONTH_EN_SHORT_NAMES[self-1]
 
     @property
     def as_en_full_name(self) -> str:
-        return {1: "January", 2: "February", 3: "March", 4: "April", 5: "May", 6: "June", 7: "July", 8: "August", 9: "September", 10: "October", 11: "November", 12: "December"}[self]
+        return MONTH_EN_FULL_NAMES[self-1]
 
     @property
     def as_2digit_str(self) -> str:
         """Returns the month as a two digit string"""
-        return f"{self:02d}"
+        return TWO_DIGIT_STRS[self]
+
+MONTH_PT_SHORT_NAMES = ("jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez")
+MONTH_PT_FULL_NAMES = ("janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho", "agosto", "setembro", "outubro", "novembro", "dezembro")
+MONTH_EN_SHORT_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+MONTH_EN_FULL_NAMES = ("January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December")
 
 class Year(int):
     """A two digit year code representing a year in between 1940 and 2039."""
 
     def __init__(self, val: int):
-        if not (MINIMUM_YEAR() <= self <= MAXIMUM_YEAR()):
+        # The window is always 100 years wide, so a single offset check covers both ends
+        if not 0 <= self - MINIMUM_YEAR() < 100:
             raise OutOfRangeError(f"Year must be between {MINIMUM_YEAR()} and {MAXIMUM_YEAR()}")
 
     def __str__(self):
@@ -70,16 +79,14 @@ class Year(int):
     @property
     def as_2digit_int(self) -> int:
         """Returns the year as a two digit number"""
-        if 2000 <= self <= MAXIMUM_YEAR():
-            return self-2000
-        elif MINIMUM_YEAR() <= self <= 1999:
-            return self-1900
+        if 0 <= self - MINIMUM_YEAR() < 100:
+            return self % 100
         raise OutOfRangeError(f"Year must be between {MINIMUM_YEAR()} and {MAXIMUM_YEAR()}")
 
     @property
     def as_2digit_str(self) -> str:
         """Returns the year as a two digit string"""
-        return f"{self.as_2digit_int:02d}"
+        return TWO_DIGIT_STRS[self.as_2digit_int]
 
 def parse_date_aa(val: str) -> Year:
     assert len(val) == 2, "aa date format must be exactly 2 characters long"
@@ -88,4 +95,35 @@ def parse_date_aa(val: str) -> Year:
 def parse_date_aamm(val: str) -> Tuple[Year, Month]:
     assert len(val) == 4, "aamm date format must be exactly 4 characters long"
     aa, mm = val[0:2], val[2:4]
-    return Year.from_2digits(aa), Month(int(mm))
\ No newline at end of file
+    return Year.from_2digits(aa), Month(int(mm))
+
+def _parse_digits_array(values: Any, n_digits: int) -> Any:
+    """Converts an array-like of n-digit ASCII strings into a 2D uint8 array of digit values (one row per string)."""
+    import numpy as np
+
+    values = np.asarray(values, dtype=str).ravel()
+    if not (np.char.str_len(values) == n_digits).all():
+        raise ValueError(f"all values must be exactly {n_digits} characters long")
+    digits = values.astype(f"S{n_digits}").view(np.uint8).reshape(-1, n_digits) - ord('0')
+    if (digits > 9).any():
+        raise ValueError("all values must be made only of digits")
+    return digits
+
+def _years_from_2digits_array(aa: Any) -> Any:
+    import numpy as np
+
+    return np.where(aa <= MAX_XXI_CENTURY_YEAR, 2000 + aa, 1900 + aa).astype(np.int16)
+
+def parse_date_aa_array(values: Any) -> Any:
+    """Vectorized version of parse_date_aa: parses an array-like (e.g. a pandas Series) of aa strings into an int16 array of years. Requires NumPy."""
+    digits = _parse_digits_array(values, 2).astype('int16')
+    return _years_from_2digits_array(digits[:, 0]*10 + digits[:, 1])
+
+def parse_date_aamm_array(values: Any) -> Tuple[Any, Any]:
+    """Vectorized version of parse_date_aamm: parses an array-like (e.g. a pandas Series) of aamm strings into an int16 array of years and an int8 array of months. Requires NumPy."""
+    digits = _parse_digits_array(values, 4).astype('int16')
+    years = _years_from_2digits_array(digits[:, 0]*10 + digits[:, 1])
+    months = digits[:, 2]*10 + digits[:, 3]
+    if ((months < 1) | (months > 12)).any():
+        raise OutOfRangeError("Month must be between 01 and 12")
+    return years, months.astype('int8')
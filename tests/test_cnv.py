@@ -1,3 +1,8 @@
+import gc
+import pickle
+import sys
+import tracemalloc
+import weakref
 import pytest
 from tabpy.cnv import *
 
@@ -108,6 +113,15 @@ def test_StrRange_in():
     assert("A99" not in r)
     assert("A100" not in r)
 
+def test_StrRange_in_mixed_lengths():
+    r = StrRange("A0", "A99")
+    assert("A" not in r)
+    assert("A0" in r)
+    assert("A5" in r)
+    assert("A50" in r)
+    assert("A990" not in r)
+    assert("B0" not in r)
+
 def test_parse_category_code_1():
     code = parse_category_code("0", False)
     assert(code == 0)
@@ -120,6 +134,15 @@ def test_parse_category_code_1():
     code = parse_category_code("A0-A9", False)
     assert(code == StrRange("A0", "A9"))
 
+def test_parse_category_code_shared_ranges():
+    assert(parse_category_code("0-9", False) is parse_category_code("00-09", False))
+    assert(parse_category_code("A0-A9", False) is parse_category_code("A0-A9", True))
+
+def test_parse_category_code_2():
+    for item in ["", "-", "0-", "-9", "0-5-9", "A,B"]:
+        with pytest.raises(ValueError):
+            parse_category_code(item, False)
+
 def test_RawCategoryLine_from_cnv_line_1():
     raw = RawCategoryLine.from_cnv_line("      3  Ignorado                                           0,3-9", False)
     assert(raw.idx == 3)
@@ -177,3 +200,160 @@ def test_CategorySet_from_cnv_file_3():
     assert(cats[0].name == 'Ignorado/Exterior')
     assert(list(map(lambda x: x.name, cats.get_path(12))) == ['Região Norte', '.. Acre'])
     assert(cats.get_root(12).name == 'Região Norte')
+
+def test_CategorySet_from_cnv_file_4():
+    cats = CategorySet.from_cnv_file(regions_cnv + "      5  Sul                                                XX\n      5  Sul                                                YY-YZ\n")
+    assert(len(cats) == 5)
+    assert(cats["XX"] == cats["SC"])
+    assert(cats["YY"] == cats["RS"])
+    assert(cats["SC"].codes == {'RS', 'PR', 'SC', 'XX'})
+    assert(cats["SC"].ranges == {StrRange('YY', 'YZ')})
+
+def test_CategorySet_get_leaf_precedence():
+    cats = CategorySet.from_cnv_file(uf_cnv)
+    assert(cats[11].name == '11 Rondônia')
+    assert(cats[20].name == '26 Pernambuco')
+    assert(cats[99].name == '00 Ignorado/exterior')
+    assert(cats["  "].name == '00 Ignorado/exterior')
+    assert(cats.get_leaf(100) is None)
+
+def test_CategorySet_lookup_array():
+    np = pytest.importorskip("numpy")
+    cats = CategorySet.from_cnv_file(sex_cnv)
+    assert(cats.lookup_array(np.array([0, 1, 2, 5, 9, 10, -1])).tolist() == [3, 1, 2, 3, 3, -1, -1])
+    cats = CategorySet.from_cnv_file(uf_cnv)
+    assert(cats.lookup_array(np.array([11, 20, 26, 99])).tolist() == [1, 13, 13, 28])
+    with pytest.raises(ValueError):
+        CategorySet.from_cnv_file(regions_cnv).lookup_array(np.array([0]))
+
+def test_CategorySet_lookup_array_beyond_code_length():
+    np = pytest.importorskip("numpy")
+    cats = CategorySet.from_cnv_file("2 1\n      1  A                                                  1-12\n      2  B                                                  20\n")
+    assert(cats[12].name == 'A')
+    assert(cats.lookup_array(np.array([0, 1, 12, 13, 20, 21])).tolist() == [-1, 1, 1, -1, 2, -1])
+    assert(list(cats.map_codes(np.array([12, 20]))) == [cats[12], cats[20]])
+
+def test_CategorySet_lookup_array_floats():
+    np = pytest.importorskip("numpy")
+    cats = CategorySet.from_cnv_file(sex_cnv)
+    assert(cats.lookup_array(np.array([1.0, np.nan, 2.0, np.inf])).tolist() == [1, -1, 2, -1])
+    with pytest.raises(ValueError):
+        cats.lookup_array(np.array([1.5]))
+    with pytest.raises(ValueError):
+        cats.lookup_array(np.array(["1"]))
+
+def test_CategorySet_lookup_array_sparse():
+    np = pytest.importorskip("numpy")
+    cats = CategorySet.from_cnv_file("""
+      4 2
+      1  Todos                                              00-99999999
+001   2  Alguns                                             10-19,12345678
+002   3  Um                                                 15
+      4  Fora                                               123456789
+"""[1:])
+    codes = np.array([0, 9, 10, 15, 19, 20, 12345678, 99999999, 100000000, 123456789, -1])
+    tracemalloc.start()
+    try:
+        ans = cats.lookup_array(codes)
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert(peak < 1_000_000)
+    assert(ans.tolist() == [1, 1, 2, 3, 2, 1, 2, 1, -1, 4, -1])
+    assert(ans.tolist() == [cat.idx if (cat := cats.get_leaf(int(code))) else -1 for code in codes])
+    assert(cats.lookup_array(np.array([15.0, np.nan, 1e30])).tolist() == [3, -1, -1])
+
+def test_CategorySet_from_cnv_file_bytes():
+    cats = CategorySet.from_cnv_file(uf_region_cnv.encode('iso-8859-1'))
+    assert(cats == CategorySet.from_cnv_file(uf_region_cnv))
+    assert(cats[11].name == '.. Rondônia')
+
+def test_CategorySet_from_cnv_path(tmp_path):
+    path = tmp_path / "uf.cnv"
+    path.write_text(uf_region_cnv, encoding='iso-8859-1')
+    cats = CategorySet.from_cnv_path(path)
+    assert(cats == CategorySet.from_cnv_file(uf_region_cnv))
+    assert(cats[12].name == '.. Acre')
+    assert(cats.get_root(12).name == 'Região Norte')
+
+def test_CategorySet_pickle():
+    cats = CategorySet.from_cnv_file(uf_region_cnv)
+    cats_copy = pickle.loads(pickle.dumps(cats))
+    assert(cats_copy == cats)
+    assert(cats_copy[12] == cats[12])
+
+def test_CategorySet_constructor_args():
+    cats = CategorySet.from_cnv_file(uf_region_cnv)
+    assert(CategorySet(cats.code_length, cats.letter_codes, cats.categories) == cats)
+    with pytest.raises(TypeError):
+        CategorySet(cats.code_length, cats.letter_codes, cats.categories, {})
+
+def test_Category_in():
+    cat = Category(1, 'Foo', {1, 12}, {IntRange(3, 9), IntRange(20, 29)})
+    for code in [1, 3, 9, 12, 20, 29]:
+        assert(code in cat)
+    for code in [-1, 0, 2, 10, 11, 13, 19, 30, 1000, "1"]:
+        assert(code not in cat)
+    parent = Category(2, 'Bar', {'X'}, children=[cat])
+    assert('X' in parent)
+    assert(12 in parent)
+    assert(100 not in parent)
+    mixed = Category(3, 'Baz', {'  '}, {IntRange(0, 99), StrRange('A0', 'A9')})
+    assert(50 in mixed)
+    assert(100 not in mixed)
+    assert('  ' in mixed)
+    assert('A5' in mixed)
+    assert('50' not in mixed)
+
+def test_CategorySet_map_codes():
+    np = pytest.importorskip("numpy")
+    cats = CategorySet.from_cnv_file(uf_region_cnv)
+    assert(list(cats.map_codes(np.array([12, 0, 1, 53]))) == [cats[12], cats[0], None, cats[53]])
+
+def test_CategorySet_flat_categories():
+    cats = CategorySet.from_cnv_file(uf_region_cnv)
+    assert(list(cats.flat_categories) == list(range(1, 34)))
+    assert(cats.flat_categories[2] == cats[11])
+
+def test_CategorySet_deep_tree():
+    depth = sys.getrecursionlimit() + 100
+    cat = Category(depth, 'leaf', {depth})
+    for idx in range(depth - 1, 0, -1):
+        cat = Category(idx, str(idx), {idx}, children=[cat])
+    cats = CategorySet(4, False, [cat])
+    assert(cats[depth].name == 'leaf')
+    assert(cats[1].name == '1')
+    assert(len(cats.get_path(depth)) == depth)
+    assert(cats.get_root(depth) is cat)
+    assert(len(cats.flat_categories) == depth)
+
+def test_CategorySet_from_cnv_file_deep_chain():
+    lines = ["1000  4\n", "      1  root                                               1\n"]
+    for idx in range(2, 1001):
+        lines.append("%03d%4d  c%-49d %d\n" % (idx - 1, idx, idx, idx))
+    cats = CategorySet.from_cnv_file("".join(lines))
+    assert(cats[1000].name == 'c1000')
+    assert(len(cats.get_path(1000)) == 1000)
+
+def test_CategorySet_freed_without_gc():
+    gc.disable()
+    try:
+        cats = CategorySet.from_cnv_file(uf_cnv)
+        cats[11]
+        cats["  "]
+        ref = weakref.ref(cats)
+        del cats
+        assert(ref() is None)
+    finally:
+        gc.enable()
+
+def test_CategorySet_shared_category():
+    leaf = Category(2, 'leaf', {5})
+    cats_a = CategorySet(1, False, [leaf])
+    cats_b = CategorySet(1, False, [Category(1, 'parent', {9}, children=[leaf])])
+    assert(cats_a.get_root(5) is leaf)
+    assert(cats_a.get_path(5) == [leaf])
+    assert(cats_b.get_root(5).name == 'parent')
+    assert([x.name for x in cats_b.get_path(5)] == ['parent', 'leaf'])
+    cats_a_copy = pickle.loads(pickle.dumps(cats_a))
+    assert(cats_a_copy.get_path(5) == [leaf])
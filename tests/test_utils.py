@@ -33,7 +33,32 @@ def test_parse_date_aamm():
     assert(parse_date_aamm("3912") == (2039, Month.December))
     assert(parse_date_aamm("4012") == (1940, Month.December))
 
+def test_parse_date_aa_array():
+    pytest.importorskip("numpy")
+    assert(parse_date_aa_array(["00", "39", "40", "99"]).tolist() == [2000, 2039, 1940, 1999])
+    with pytest.raises(ValueError):
+        parse_date_aa_array(["0"])
+    with pytest.raises(ValueError):
+        parse_date_aa_array(["0a"])
+
+def test_parse_date_aamm_array():
+    pytest.importorskip("numpy")
+    years, months = parse_date_aamm_array(["0001", "3912", "4006"])
+    assert(years.tolist() == [2000, 2039, 1940])
+    assert(months.tolist() == [1, 12, 6])
+    with pytest.raises(ValueError):
+        parse_date_aamm_array(["0013"])
+    with pytest.raises(ValueError):
+        parse_date_aamm_array(["00012"])
+
 def test_month_str():
     assert(Month.January.as_2digit_str == "01")
     assert(Month.September.as_2digit_str == "09")
-    assert(Month.December.as_2digit_str == "12")
\ No newline at end of file
+    assert(Month.December.as_2digit_str == "12")
+
+def test_month_names():
+    assert(Month.May.as_pt_short_name == "mai")
+    assert(Month.May.as_pt_full_name == "maio")
+    assert(Month.March.as_pt_full_name == "março")
+    assert(Month.December.as_en_short_name == "Dec")
+    assert(Month.January.as_en_full_name == "January")